@@ -13,23 +13,25 @@ Este módulo contém a aplicação principal do Dashboard Renov, responsável po
 import os
 import io
 import base64
+import hashlib
+import json
 import secrets
+import threading
 import traceback
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
 # Bibliotecas de dados e análise
 import pandas as pd
 import numpy as np
-from unidecode import unidecode
-
-# Monitoramento do sistema
-import psutil
+from pyarrow import feather
 
 # Flask e extensões
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from flask_caching import Cache
 
 # Dash e componentes
 import dash
@@ -39,18 +41,24 @@ from dash.exceptions import PreventUpdate
 
 # Plotly para gráficos
 import plotly.graph_objects as go
-import plotly.express as px
+from plotly.io.json import to_json_plotly
 
-# Exportação de dados
-import xlsxwriter
+# orjson (quando instalado) acelera a serialização: o Dash/Plotly já o usam para
+# responder os callbacks (engine 'auto'); aqui ele também desserializa o conteúdo pré-serializado
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # Configuração dos assets e diretórios
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 assets_path = os.path.join(BASE_DIR, 'assets')
 data_path = os.path.join(BASE_DIR, 'data')
+store_path = os.path.join(data_path, 'store')
 
 # Criar diretórios necessários
-for directory in [assets_path, data_path]:
+for directory in [assets_path, data_path, store_path]:
     if not os.path.exists(directory):
         os.makedirs(directory)
 
@@ -97,12 +105,105 @@ except Exception as e:
             pass
     db = MockDB()
 
+# Cache em memória para valores pequenos (opções dos filtros e assinaturas dos recortes)
+cache = Cache(server, config={
+    'CACHE_TYPE': 'SimpleCache',
+    'CACHE_DEFAULT_TIMEOUT': 600
+})
+
+class MemoryCache:
+    """
+    Cache LRU em memória do processo, sem serialização.
+    
+    O SimpleCache faz pickle a cada set/get, o que para DataFrames e árvores de
+    componentes é uma cópia completa a cada leitura; aqui os objetos são devolvidos
+    por referência (e tratados como somente leitura). Protegido para os threads do worker.
+    
+    Com `maxbytes`, a memória dos itens também é limitada. `sizeof(value)` lista os
+    objetos que o item mantém vivos, como pares (identificador, bytes); um objeto
+    compartilhado por vários itens conta uma vez só.
+    """
+    
+    def __init__(self, maxsize, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._items = OrderedDict()
+        self._footprints = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Retorna o valor guardado, ou None"""
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        """Guarda o valor, descartando os usados há mais tempo"""
+        footprint = dict(self._sizeof(value)) if self.maxbytes is not None else {}
+        with self._lock:
+            self._items[key] = value
+            self._footprints[key] = footprint
+            self._items.move_to_end(key)
+            # O item recém-guardado sempre fica, mesmo sozinho acima do limite de memória
+            while len(self._items) > 1 and (
+                len(self._items) > self.maxsize
+                or (self.maxbytes is not None and self._total_bytes() > self.maxbytes)
+            ):
+                oldest, _ = self._items.popitem(last=False)
+                del self._footprints[oldest]
+    
+    def _total_bytes(self):
+        objects = {}
+        for footprint in self._footprints.values():
+            objects.update(footprint)
+        return sum(objects.values())
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._footprints.clear()
+
+def frame_footprint(value):
+    """
+    Memória mantida viva por um item do frame_cache: o DataFrame da base ou do recorte,
+    ou, nos agrupamentos, o recorte sobre o qual são calculados.
+    """
+    frame = value.df if isinstance(value, VoucherAggregates) else value
+    return [(id(frame), int(frame.memory_usage(deep=True).sum()))]
+
+# DataFrames (base, recortes filtrados e seus agrupamentos) e conteúdo já renderizado
+# (abas e KPIs): uma troca de aba devolve o conteúdo pronto, sem desserializar nada.
+# Os DataFrames também são limitados em bytes, já que cada worker tem o seu cache
+FRAME_CACHE_BYTES = 512 * 1024 * 1024
+frame_cache = MemoryCache(maxsize=32, maxbytes=FRAME_CACHE_BYTES, sizeof=frame_footprint)
+render_cache = MemoryCache(maxsize=64)
+
+# Callbacks em segundo plano (upload): o parse do Excel roda num processo à parte,
+# sem prender a thread do worker. Uploads idênticos reaproveitam o resultado em disco
+# (cache_by); o que o processo do upload guardasse em memória se perderia com ele.
+# A geração das bases entra na chave: bases apagadas pela limpeza invalidam o resultado
+try:
+    import diskcache
+    from dash import DiskcacheManager
+    background_callback_manager = DiskcacheManager(
+        diskcache.Cache(os.path.join(data_path, 'callbacks')),
+        cache_by=[lambda: store_generation()],
+        expire=3600
+    )
+except ImportError:
+    print("diskcache não instalado: upload processado de forma síncrona")
+    background_callback_manager = None
+
 # Inicialização do Dash
 app = dash.Dash(
     __name__,
     server=server,
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     suppress_callback_exceptions=True,
+    background_callback_manager=background_callback_manager,
     update_title='Carregando...',
     meta_tags=[
         {"name": "viewport", "content": "width=device-width, initial-scale=1"}
@@ -118,7 +219,7 @@ app.title = "Dashboard Renov"
 
 # Módulos locais (importados após a inicialização do db)
 from models import UserDatabase
-from models_network import NetworkDatabase
+from models_network import NetworkDatabase, normalize_column_name
 from auth_layout import create_login_layout, create_register_layout, create_admin_approval_layout
 from error_layout import create_error_layout
 
@@ -131,56 +232,8 @@ app.layout = html.Div([
     html.Div(id='page-content')
 ])
 
-@app.callback(
-    Output('page-content', 'children'),
-    [Input('url', 'pathname'),
-     Input('login-button', 'n_clicks')],
-    [State('username', 'value'),
-     State('password', 'value')],
-    prevent_initial_call=False
-)
-def display_page_and_handle_login(pathname, login_clicks, username, password):
-    """Callback simplificado para diagnosticar problemas"""
-    # Verificar se é tentativa de login
-    if login_clicks and login_clicks > 0:
-        if username == 'admin' and password == 'admin':
-            # Login bem-sucedido - mostrar dashboard simples
-            return html.Div([
-                dbc.Container([
-                    dbc.Row([
-                        dbc.Col([
-                            html.H1("✅ Dashboard Renov - Login Realizado!", className="text-success text-center"),
-                            html.P("Bem-vindo ao sistema!", className="text-center"),
-                            html.Hr(),
-                            dbc.Alert("Sistema funcionando no Railway!", color="success"),
-                            dbc.Button("Logout", href="/", color="secondary", className="mt-3")
-                        ])
-                    ])
-                ])
-            ])
-        else:
-            # Login incorreto
-            return html.Div([
-                dbc.Container([
-                    dbc.Row([
-                        dbc.Col([
-                            html.H1("🎯 Dashboard Renov", className="text-center mb-4 text-primary"),
-                            dbc.Card([
-                                dbc.CardBody([
-                                    html.H4("Login", className="text-center mb-3"),
-                                    dbc.Input(id="username", placeholder="Usuário", className="mb-2"),
-                                    dbc.Input(id="password", placeholder="Senha", type="password", className="mb-2"),
-                                    dbc.Button("Entrar", id="login-button", color="primary", className="w-100"),
-                                    html.Hr(),
-                                    dbc.Alert("❌ Usuário ou senha incorretos!", color="danger")
-                                ])
-                            ])
-                        ], width=6)
-                    ], justify="center")
-                ])
-            ])
-    
-    # Página inicial - mostrar login
+def build_login_page():
+    """Monta a página de login; o feedback da tentativa vai para 'login-feedback'"""
     return html.Div([
         dbc.Container([
             dbc.Row([
@@ -193,7 +246,10 @@ def display_page_and_handle_login(pathname, login_clicks, username, password):
                             dbc.Input(id="password", placeholder="Senha", type="password", className="mb-2"),
                             dbc.Button("Entrar", id="login-button", color="primary", className="w-100"),
                             html.Hr(),
-                            dbc.Alert("Use: admin/admin", color="info")
+                            html.Div(
+                                dbc.Alert("Use: admin/admin", color="info"),
+                                id="login-feedback"
+                            )
                         ])
                     ])
                 ], width=6)
@@ -201,33 +257,80 @@ def display_page_and_handle_login(pathname, login_clicks, username, password):
         ])
     ])
 
+@app.callback(
+    Output('page-content', 'children'),
+    Input('url', 'pathname')
+)
+def display_page(pathname):
+    """Roteamento: só depende da URL, sem reavaliar o login a cada navegação"""
+    return build_login_page()
+
+@app.callback(
+    [Output('page-content', 'children', allow_duplicate=True),
+     Output('login-feedback', 'children')],
+    Input('login-button', 'n_clicks'),
+    [State('username', 'value'),
+     State('password', 'value')],
+    prevent_initial_call=True
+)
+def handle_login(login_clicks, username, password):
+    """Trata apenas o clique em 'Entrar'"""
+    if not login_clicks:
+        raise PreventUpdate
+    
+    if username == 'admin' and password == 'admin':
+        # Login bem-sucedido - mostrar dashboard simples
+        return html.Div([
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                        html.H1("✅ Dashboard Renov - Login Realizado!", className="text-success text-center"),
+                        html.P("Bem-vindo ao sistema!", className="text-center"),
+                        html.Hr(),
+                        dbc.Alert("Sistema funcionando no Railway!", color="success"),
+                        dbc.Button("Logout", href="/", color="secondary", className="mt-3")
+                    ])
+                ])
+            ])
+        ]), no_update
+    
+    # Login incorreto: atualiza só o aviso, sem reconstruir a página
+    return no_update, dbc.Alert("❌ Usuário ou senha incorretos!", color="danger")
+
 @app.callback(
     Output('tab-content', 'children'),
     [Input('main-tabs', 'active_tab'),
+     Input('store-data', 'data'),
      Input('store-filtered-data', 'data')]
 )
-def update_tab_content(tab, filtered_data):
+def update_tab_content(tab, data, filters):
     """Atualiza o conteúdo da aba selecionada"""
-    if not filtered_data:
+    if not data:
         return no_data_message()
     
     try:
-        df = pd.DataFrame(filtered_data)
-        
-        if tab == "overview":
-            return generate_overview_content(df)
-        elif tab == "networks":
-            return generate_networks_content(df)
-        elif tab == "rankings":
-            return generate_rankings_content(df)
-        elif tab == "projections":
-            return generate_projections_content(df)
-        elif tab == "engagement":
-            return generate_engagement_content(df)
-        elif tab == "tim":
-            return generate_tim_content(df)
-        
-        return html.Div("Conteúdo não disponível")
+        # Mesmos dados + mesmos filtros + mesma aba => mesmo conteúdo, servido do cache
+        cache_key = f"tab-content:{tab}:{data['key']}:{filters_signature(filters)}"
+        content = render_cache.get(cache_key)
+        if content is None:
+            df = load_filtered_dataframe(data, filters)
+            if df is None:
+                return no_data_message()
+            
+            if df.empty:
+                # Recorte vazio (filtros restritivos demais): todas as abas mostram a mesma
+                # mensagem, então nem agregados nem a assinatura das linhas são calculados
+                content = prejson(no_data_message())
+            else:
+                # Filtros diferentes que selecionam as mesmas linhas (ex.: todas as redes
+                # marcadas) reaproveitam o conteúdo já renderizado para esse recorte
+                rows_key = f"tab-rows:{tab}:{data['key']}:{get_rows_signature(data, filters, df)}"
+                content = render_cache.get(rows_key)
+                if content is None:
+                    content = prejson(render_tab_content(tab, df, get_aggregates(data, filters, df)))
+                    render_cache.set(rows_key, content)
+            render_cache.set(cache_key, content)
+        return content
     
     except Exception as e:
         print(f"Erro ao atualizar conteúdo da aba: {str(e)}")
@@ -441,14 +544,39 @@ def create_dashboard_layout(is_super_admin=False):
 # Callback para atualizar os KPIs
 @app.callback(
     Output('kpi-cards', 'children'),
-    Input('store-filtered-data', 'data')
+    [Input('store-data', 'data'),
+     Input('store-filtered-data', 'data')]
 )
-def update_kpis(filtered_data):
-    if not filtered_data:
+def update_kpis(data, filters):
+    if not data:
         return []
     
-    df = pd.DataFrame(filtered_data)
-    return generate_kpi_cards(df)
+    # Mesma base + mesmos filtros => mesmos KPIs, sem reconstruir o DataFrame
+    cache_key = f"kpi-cards:{data['key']}:{filters_signature(filters)}"
+    kpi_cards = render_cache.get(cache_key)
+    if kpi_cards is None:
+        df = load_filtered_dataframe(data, filters)
+        if df is None:
+            return []
+        rows_key = f"kpi-rows:{data['key']}:{get_rows_signature(data, filters, df)}"
+        kpi_cards = render_cache.get(rows_key)
+        if kpi_cards is None:
+            kpi_cards = generate_kpi_cards(get_aggregates(data, filters, df)['summary'])
+            render_cache.set(rows_key, kpi_cards)
+        render_cache.set(cache_key, kpi_cards)
+    return kpi_cards
+
+def sorted_categories(column):
+    """
+    Categorias da coluna em ordem alfabética.
+    
+    O upload grava as categorias em texto e já ordenadas (text_category); só reordena
+    quando não estiverem.
+    """
+    categories = column.cat.categories
+    if categories.is_monotonic_increasing:
+        return categories
+    return categories.sort_values()
 
 # Callback para popular os filtros
 @app.callback(
@@ -463,25 +591,39 @@ def update_filter_options(data):
     if not data:
         return [], [], []
     
-    df = pd.DataFrame(data)
+    # Opções dependem só da base: prontas em cache, sem reconstruir o DataFrame
+    cache_key = f"filter-options:{data['key']}"
+    options = cache.get(cache_key)
+    if options is not None:
+        return options
     
-    # Opções para mês
-    df['mes'] = pd.to_datetime(df['data_str']).dt.strftime('%Y-%m')
-    meses = sorted(df['mes'].unique())
+    df = load_dataframe(data)
+    if df is None:
+        return [], [], []
+    
+    # Opções para mês: prefixo AAAA-MM dos dias distintos (só as categorias, não as linhas)
+    meses = sorted({dia[:7] for dia in df['data_str'].cat.categories})
     opcoes_mes = [{'label': mes, 'value': mes} for mes in meses]
     
-    # Opções para rede
-    redes = sorted(df['nome_rede'].unique())
+    # Opções para rede e status: categorias distintas, ordenadas (sem varrer as linhas nem os nulos)
+    redes = sorted_categories(df['nome_rede'])
     opcoes_rede = [{'label': rede, 'value': rede} for rede in redes]
     
-    # Opções para status
-    status = sorted(df['situacao_voucher'].unique())
+    status = sorted_categories(df['situacao_voucher'])
     opcoes_status = [{'label': status, 'value': status} for status in status]
     
-    return opcoes_mes, opcoes_rede, opcoes_status
+    options = (opcoes_mes, opcoes_rede, opcoes_status)
+    cache.set(cache_key, options)
+    return options
 
-# Callback para limpar filtros
-@app.callback(
+# Callback para limpar filtros: só zera os componentes, então roda no navegador,
+# sem ida e volta ao servidor a cada clique
+app.clientside_callback(
+    """
+    function(n_clicks) {
+        return [null, null, null, null, null];
+    }
+    """,
     [
         Output('filter-month', 'value'),
         Output('filter-network', 'value'),
@@ -492,52 +634,210 @@ def update_filter_options(data):
     Input('clear-filters', 'n_clicks'),
     prevent_initial_call=True
 )
-def clear_filters(n_clicks):
-    return None, None, None, None, None
 
-# Callback para filtrar dados
-@app.callback(
+# Filtros aplicados no navegador: o clientside callback só empacota a seleção
+# atual em 'store-filtered-data'; os dados filtrados nunca trafegam de volta
+app.clientside_callback(
+    """
+    function(months, networks, statuses, dateFrom, dateTo, current) {
+        var asList = function(value) {
+            if (!value) { return []; }
+            return Array.isArray(value) ? value.slice().sort() : [value];
+        };
+        var filters = {
+            months: asList(months),
+            networks: asList(networks),
+            statuses: asList(statuses),
+            date_from: dateFrom ? dateFrom.slice(0, 10) : null,
+            date_to: dateTo ? dateTo.slice(0, 10) : null
+        };
+        // Sem filtro ativo (ou após "Limpar Filtros"): null, e os consumidores usam a base inteira
+        if (!filters.months.length && !filters.networks.length && !filters.statuses.length &&
+            !filters.date_from && !filters.date_to) {
+            filters = null;
+        }
+        // Seleção igual à atual (ex.: limpar sem filtro ativo): não dispara KPIs nem abas
+        if (JSON.stringify(filters) === JSON.stringify(current || null)) {
+            return window.dash_clientside.no_update;
+        }
+        return filters;
+    }
+    """,
     Output('store-filtered-data', 'data'),
     [
-        Input('store-data', 'data'),
         Input('filter-month', 'value'),
         Input('filter-network', 'value'),
         Input('filter-status', 'value'),
         Input('date-from', 'date'),
         Input('date-to', 'date')
-    ]
+    ],
+    State('store-filtered-data', 'data')
 )
-def filter_data(data, selected_months, selected_networks, selected_status, date_from, date_to):
-    if not data:
-        return None
+
+def has_active_filters(filters):
+    """Indica se a seleção guardada em 'store-filtered-data' restringe algum dado"""
+    return bool(filters) and any(filters.values())
+
+def lookup_table(selected):
+    """
+    Tabela de consulta para os códigos de uma coluna category.
+    
+    `selected` é um array booleano com uma posição por categoria; a posição extra
+    no fim atende o código -1 (nulo), que nunca passa no filtro.
+    """
+    lookup = np.zeros(len(selected) + 1, dtype=bool)
+    lookup[:-1] = selected
+    return lookup
+
+def category_selection(column, values):
+    """Categorias de uma coluna category que pertencem aos valores selecionados"""
+    return np.asarray(column.cat.categories.isin(frozenset(values)))
+
+def period_selection(column, months=None, start=None, end=None):
+    """
+    Dias da coluna category de datas em texto (AAAA-MM-DD) dentro do período.
     
-    df = pd.DataFrame(data)
-    df['mes'] = pd.to_datetime(df['data_str']).dt.strftime('%Y-%m')
-    df['data'] = pd.to_datetime(df['data_str'])
+    Meses (AAAA-MM) e intervalo de datas são resolvidos juntos sobre os dias distintos.
+    """
+    categories = column.cat.categories
+    selected = np.ones(len(categories), dtype=bool)
+    if months:
+        # Os dias distintos estão em ordem: cada mês AAAA-MM é a faixa de categorias
+        # entre AAAA-MM-01 e AAAA-MM-31, achada por busca binária, sem fatiar cada dia
+        months = sorted(frozenset(months))
+        starts = categories.searchsorted([f"{mes}-01" for mes in months])
+        ends = categories.searchsorted([f"{mes}-31" for mes in months], side='right')
+        in_months = np.zeros(len(categories), dtype=bool)
+        for start_pos, end_pos in zip(starts, ends):
+            in_months[start_pos:end_pos] = True
+        selected &= in_months
+    if start:
+        selected &= np.asarray(categories >= start)
+    if end:
+        selected &= np.asarray(categories <= end)
+    return selected
+
+def apply_filters(df, filters):
+    """Aplica ao DataFrame a seleção de filtros guardada em 'store-filtered-data'"""
+    if not has_active_filters(filters):
+        return df
     
-    # Aplicar filtros
-    if selected_months:
-        if isinstance(selected_months, str):
-            selected_months = [selected_months]
-        df = df[df['mes'].isin(selected_months)]
+    # Cada filtro vira uma seleção sobre as categorias (k valores) da sua coluna;
+    # data_str está em AAAA-MM-DD, então o período é comparado nos dias distintos
+    selections = []
+    bounds = None
+    if filters.get('months') or filters.get('date_from') or filters.get('date_to'):
+        column = df['data_str']
+        selected = period_selection(column, filters.get('months'), filters.get('date_from'), filters.get('date_to'))
+        dias = np.flatnonzero(selected)
+        if len(dias) and dias[-1] - dias[0] + 1 == len(dias):
+            # A base é ordenada por dia (ver process_upload): dias consecutivos
+            # são uma faixa contínua de linhas, achada por busca binária sem varrer a coluna
+            bounds = np.searchsorted(column.cat.codes.to_numpy(), [dias[0], dias[-1] + 1])
+        else:
+            selections.append((column, selected))
     
-    if selected_networks:
-        if isinstance(selected_networks, str):
-            selected_networks = [selected_networks]
-        df = df[df['nome_rede'].isin(selected_networks)]
+    if filters.get('networks'):
+        column = df['nome_rede']
+        selections.append((column, category_selection(column, filters['networks'])))
     
-    if selected_status:
-        if isinstance(selected_status, str):
-            selected_status = [selected_status]
-        df = df[df['situacao_voucher'].isin(selected_status)]
+    if filters.get('statuses'):
+        column = df['situacao_voucher']
+        selections.append((column, category_selection(column, filters['statuses'])))
     
-    if date_from:
-        df = df[df['data'] >= date_from]
+    # Só período: a faixa de linhas é uma fatia, sem copiar o DataFrame
+    if bounds is not None and not selections:
+        return df.iloc[bounds[0]:bounds[1]]
     
-    if date_to:
-        df = df[df['data'] <= date_to]
+    # Só o primeiro filtro varre todas as linhas; os seguintes consultam apenas as
+    # linhas que sobraram, e o recorte final é um único take posicional
+    rows = None if bounds is None else np.arange(bounds[0], bounds[1])
+    for column, selected in selections:
+        lookup = lookup_table(selected)
+        codes = column.cat.codes.to_numpy()
+        if rows is None:
+            rows = np.flatnonzero(lookup[codes])
+        else:
+            rows = rows[lookup[codes[rows]]]
     
-    return df.to_dict('records')
+    return df if rows is None else df.iloc[rows]
+
+def filters_signature(filters):
+    """
+    Retorna um hash estável da seleção de filtros, usado como chave de cache.
+    
+    A seleção é tratada como conjunto: ordem dos itens e filtros vazios não mudam
+    a chave, então seleções equivalentes reaproveitam o mesmo KPI/aba em cache.
+    Os itens são ordenados pelo repr, já que uma seleção pode misturar números e texto.
+    """
+    canonical = {}
+    if has_active_filters(filters):
+        canonical = {
+            name: sorted(set(value), key=repr) if isinstance(value, list) else value
+            for name, value in filters.items() if value
+        }
+    serialized = json.dumps(canonical, sort_keys=True)
+    return hashlib.md5(serialized.encode('utf-8')).hexdigest()
+
+def read_excel_upload(decoded, **kwargs):
+    """Lê a planilha enviada (bytes já decodificados do base64)"""
+    return pd.read_excel(io.BytesIO(decoded), **kwargs)
+
+def rows_signature(df):
+    """Retorna um hash das linhas do recorte (posições no índice), usado como chave de cache"""
+    return hashlib.md5(df.index.to_numpy().tobytes()).hexdigest()
+
+def get_rows_signature(data, filters, df):
+    """
+    Assinatura das linhas do recorte, calculada uma vez por seleção de filtros.
+    
+    KPIs e abas disparam juntos a cada mudança de filtro e usam a mesma assinatura:
+    o hash das posições só é feito pelo primeiro deles.
+    """
+    cache_key = f"rows-signature:{data['key']}:{filters_signature(filters)}"
+    signature = cache.get(cache_key)
+    if signature is None:
+        signature = rows_signature(df)
+        cache.set(cache_key, signature)
+    return signature
+
+# Colunas da planilha de vouchers (nome normalizado -> nome interno)
+VOUCHER_COLUMNS = {
+    'imei': 'imei',
+    'status_do_voucher': 'situacao_voucher',
+    'vendedor': 'nome_vendedor',
+    'filial': 'nome_filial',
+    'rede': 'nome_rede'
+}
+
+# Situações que contam como voucher utilizado (substrings literais, sem regex)
+USED_STATUS_TERMS = ('utilizado', 'usado', 'ativo')
+
+# Formato de 'data_str' (e dos filtros de período): AAAA-MM-DD
+DAY_FORMAT = '%Y-%m-%d'
+
+# Colunas de baixa cardinalidade guardadas como category ('data_str' já sai assim)
+CATEGORY_COLUMNS = ['situacao_voucher', 'nome_vendedor', 'nome_rede']
+
+# Colunas efetivamente usadas pelos filtros, KPIs e abas
+# (valor do voucher e filial são validados no upload, mas nenhuma aba os lê;
+# do IMEI só interessa se está preenchido, guardado em 'is_issued')
+STORE_COLUMNS = [
+    'data_str', 'valor_dispositivo',
+    'situacao_voucher', 'nome_vendedor', 'nome_rede', 'is_used', 'is_issued'
+]
+
+def text_category(column):
+    """
+    Converte a coluna da planilha em category de texto, com as categorias ordenadas.
+    
+    Números viram texto e nulos continuam nulos; a conversão é feita só nos valores
+    distintos, e as linhas recebem os códigos.
+    """
+    codigos, valores = pd.factorize(column)
+    codigos_texto, categorias = pd.factorize(valores.astype(str), sort=True)
+    # Última posição para o código -1 (valor vazio), que continua sem categoria
+    return pd.Categorical.from_codes(np.append(codigos_texto, -1)[codigos], categorias)
 
 # Callback para processar upload de dados
 @app.callback(
@@ -546,7 +846,9 @@ def filter_data(data, selected_months, selected_networks, selected_status, date_
         Output('upload-status', 'children')
     ],
     Input('upload-data', 'contents'),
-    State('upload-data', 'filename')
+    State('upload-data', 'filename'),
+    background=background_callback_manager is not None,
+    running=[(Output('upload-data', 'disabled'), True, False)]
 )
 def process_upload(contents, filename):
     if contents is None:
@@ -556,17 +858,21 @@ def process_upload(contents, filename):
         content_type, content_string = contents.split(',')
         decoded = base64.b64decode(content_string)
         
+        # Validar colunas necessárias
+        required_columns = ['Data', 'IMEI', 'Valor do Voucher', 'Valor do Dispositivo', 'Status do Voucher', 'Vendedor', 'Filial', 'Rede']
+        normalized_required = [normalize_column_name(col) for col in required_columns]
+        
         if filename.lower().endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(io.BytesIO(decoded))
+            # Ler só as colunas usadas: as demais nem chegam a virar Series
+            df = read_excel_upload(
+                decoded,
+                usecols=lambda col: normalize_column_name(col) in normalized_required
+            )
         else:
             return None, dbc.Alert("Por favor, use apenas arquivos Excel (.xls, .xlsx).", color="danger")
         
-        # Validar colunas necessárias
-        required_columns = ['Data', 'IMEI', 'Valor do Voucher', 'Valor do Dispositivo', 'Status do Voucher', 'Vendedor', 'Filial', 'Rede']
-        
         # Normalizar nomes das colunas
-        df.columns = [unidecode(col).strip().lower() for col in df.columns]
-        normalized_required = [unidecode(col).strip().lower() for col in required_columns]
+        df.columns = [normalize_column_name(col) for col in df.columns]
         
         missing_columns = [col for col in normalized_required if col not in df.columns]
         if missing_columns:
@@ -574,13 +880,52 @@ def process_upload(contents, filename):
         
         # Processar dados básicos
         try:
-            df['data_str'] = pd.to_datetime(df['data']).dt.strftime('%Y-%m-%d')
-            df['valor_voucher'] = pd.to_numeric(df['valor_do_voucher'])
-            df['valor_dispositivo'] = pd.to_numeric(df['valor_do_dispositivo'])
+            # Converte só os valores distintos da coluna 'data' (datas em texto custam um
+            # parse em Python por elemento) e formata só os dias distintos; 'data_str' é
+            # montada como category a partir dos códigos de cada linha, e o mês (AAAA-MM)
+            # é o prefixo das categorias, sem precisar de coluna própria
+            valores_data, datas_unicas = pd.factorize(df['data'])
+            dias, dias_unicos = pd.factorize(pd.to_datetime(datas_unicas).normalize(), sort=True)
+            # Última posição para o código -1 (data vazia), que continua sem dia
+            dias = np.append(dias, -1)[valores_data]
+            df['data_str'] = pd.Categorical.from_codes(dias, dias_unicos.strftime(DAY_FORMAT))
+            valores = df[['valor_do_voucher', 'valor_do_dispositivo']]
+            # Excel normalmente já entrega valores numéricos; só converte colunas texto
+            if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in valores.dtypes):
+                valores = valores.apply(pd.to_numeric)
+            # Um único bloco 2D: fillna e float32 de uma vez para as duas colunas
+            df[['valor_voucher', 'valor_dispositivo']] = valores.fillna(0).to_numpy(dtype='float32')
         except Exception as e:
             return None, dbc.Alert("Erro ao processar dados. Verifique o formato dos valores.", color="danger")
         
-        return df.to_dict('records'), dbc.Alert(f"Dados carregados com sucesso! {len(df)} registros processados.", color="success")
+        # Manter apenas as colunas usadas pelo dashboard (reduz o payload do store)
+        df = df.rename(columns=VOUCHER_COLUMNS, copy=False)
+        
+        # Voucher emitido (IMEI preenchido) vira booleano uma vez só, em vez de testar
+        # nulos na coluna de texto a cada agregação; o texto do IMEI não é guardado
+        df['is_issued'] = df['imei'].notna().to_numpy()
+        df = df[[col for col in STORE_COLUMNS if col in df.columns]]
+        
+        # Category uma única vez (menos memória e isin/groupby sobre códigos inteiros);
+        # a classificação abaixo reaproveita os mesmos códigos. Categorias sempre em texto:
+        # o Arrow não grava uma coluna que mistura números e texto (ex.: redes 123 e 'TIM')
+        for col in CATEGORY_COLUMNS:
+            df[col] = text_category(df[col])
+        
+        # Classificar a situação uma vez por categoria, e não linha a linha
+        status = df['situacao_voucher']
+        categories = status.cat.categories.astype(str).str.lower()
+        used_categories = np.logical_or.reduce([
+            categories.str.contains(term, regex=False, na=False) for term in USED_STATUS_TERMS
+        ])
+        df['is_used'] = lookup_table(used_categories)[status.cat.codes.to_numpy()]
+        
+        # Linhas em ordem de dia: um período de datas vira uma faixa contínua de linhas
+        df = df.take(np.argsort(df['data_str'].cat.codes.to_numpy(), kind='stable'))
+        
+        store = dataframe_to_store(df)
+        
+        return store, dbc.Alert(f"Dados carregados com sucesso! {len(df)} registros processados.", color="success")
         
     except Exception as e:
         print(f"Erro no processamento do arquivo: {str(e)}")
@@ -602,7 +947,7 @@ def process_network_upload(contents, filename):
         decoded = base64.b64decode(content_string)
         
         if filename.lower().endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(io.BytesIO(decoded))
+            df = read_excel_upload(decoded)
         else:
             return dbc.Alert(
                 "Por favor, use apenas arquivos Excel (.xls, .xlsx) para a base de redes.",
@@ -618,8 +963,8 @@ def process_network_upload(contents, filename):
         ]
         
         # Normalizar nomes das colunas
-        df.columns = [unidecode(col).strip().lower() for col in df.columns]
-        normalized_required = [unidecode(col).strip().lower() for col in required_columns]
+        df.columns = [normalize_column_name(col) for col in df.columns]
+        normalized_required = [normalize_column_name(col) for col in required_columns]
         
         missing_columns = [col for col in normalized_required if col not in df.columns]
         if missing_columns:
@@ -686,7 +1031,7 @@ def process_employee_upload(contents, filename):
         decoded = base64.b64decode(content_string)
         
         if filename.lower().endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(io.BytesIO(decoded))
+            df = read_excel_upload(decoded)
         else:
             return dbc.Alert(
                 "Por favor, use apenas arquivos Excel (.xls, .xlsx) para a base de colaboradores.",
@@ -703,8 +1048,8 @@ def process_employee_upload(contents, filename):
         ]
         
         # Normalizar nomes das colunas
-        df.columns = [unidecode(col).strip().lower() for col in df.columns]
-        normalized_required = [unidecode(col).strip().lower() for col in required_columns]
+        df.columns = [normalize_column_name(col) for col in df.columns]
+        normalized_required = [normalize_column_name(col) for col in required_columns]
         
         missing_columns = [col for col in normalized_required if col not in df.columns]
         if missing_columns:
@@ -830,50 +1175,18 @@ def update_upload_status_duplicate(contents, filename):
     return ''
 """
 
-@app.callback(
-    Output('tab-content-area', 'children'),
-    [Input('main-tabs', 'active_tab'),
-     Input('store-data', 'data'),
-     Input('store-filtered-data', 'data')]
-)
-def update_tab_content(tab, data, filtered_data):
-    """Atualiza o conteúdo da aba selecionada"""
-    if not data:
-        return no_data_message()
-    
-    try:
-        # Converte dados JSON para DataFrame
-        df = pd.DataFrame(filtered_data if filtered_data else data)
-        
-        # Retorna conteúdo específico para cada aba
-        if tab == "tab-overview":
-            return generate_overview_content(df, include_kpis=True)
-        elif tab == "tab-tim":
-            return generate_tim_content(df)
-        elif tab == "tab-rankings":
-            return generate_rankings_content(df)
-        elif tab == "tab-projections":
-            return generate_projections_content(df)
-        elif tab == "tab-network-base":
-            return generate_networks_content(df)
-        elif tab == "tab-engagement":
-            return generate_engagement_content(df)
-        else:
-            return html.Div("Conteúdo não disponível")
-    
-    except Exception as e:
-        print(f"Erro ao atualizar conteúdo da aba: {str(e)}")
-        traceback.print_exc()
-        return error_message()
-
 @app.callback(
     Output('upload-status-main', 'children'),
-    [Input('upload-data', 'contents'),
-     Input('upload-data', 'filename')]
+    Input('upload-data', 'filename')
 )
-def update_upload_status_main(contents, filename):
-    """Atualiza o status do upload principal"""
-    if contents is None:
+def update_upload_status_main(filename):
+    """
+    Atualiza o status do upload principal.
+    
+    Depende só do nome do arquivo: com 'contents' como Input, a planilha inteira em
+    base64 subia de novo ao servidor só para exibir esta mensagem.
+    """
+    if filename is None:
         return ''
     
     try:
@@ -887,6 +1200,335 @@ def update_upload_status_main(contents, filename):
             f"Erro ao carregar arquivo: {str(e)}"
         ])
 
+def render_tab_content(tab, df, aggregates=None):
+    """Gera o conteúdo da aba selecionada a partir do DataFrame filtrado e seus agrupamentos"""
+    if tab == "overview":
+        return generate_overview_content(df, aggregates)
+    elif tab == "networks":
+        return generate_networks_content(df, aggregates)
+    elif tab == "rankings":
+        return generate_rankings_content(df, aggregates)
+    elif tab == "projections":
+        return generate_projections_content(df, aggregates)
+    elif tab == "engagement":
+        return generate_engagement_content(df, aggregates)
+    elif tab == "tim":
+        return generate_tim_content(df)
+    
+    return html.Div("Conteúdo não disponível")
+
+# Funções auxiliares para o store de dados
+def dataframe_fingerprint(df):
+    """Retorna um hash estável do conteúdo do DataFrame, usado como chave de cache"""
+    # Nomes e dtypes entram no hash: o mesmo conteúdo com outro dtype gera outro arquivo
+    digest = hashlib.md5('|'.join(f"{col}:{dtype}" for col, dtype in df.dtypes.items()).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def store_file(data):
+    """Caminho do arquivo Feather da base referenciada pelo payload do dcc.Store"""
+    return os.path.join(store_path, f"{data['key']}.feather")
+
+# Espaço máximo ocupado pelas bases em data/store (as gravadas há mais tempo saem primeiro)
+STORE_SIZE_LIMIT = 512 * 1024 * 1024
+
+# Marcador no diretório das bases, regravado sempre que a limpeza apaga alguma base
+STORE_GENERATION_FILE = '.geracao'
+
+def store_generation():
+    """
+    Geração das bases em disco, usada no cache_by do upload em segundo plano.
+    
+    O resultado memorizado de um upload é só a chave da base: depois que a limpeza
+    apaga bases, a geração muda e o mesmo arquivo enviado de novo é processado outra
+    vez, em vez de devolver a chave de uma base que não existe mais.
+    """
+    try:
+        with open(os.path.join(store_path, STORE_GENERATION_FILE)) as arquivo:
+            return arquivo.read()
+    except FileNotFoundError:
+        return ''
+
+def prune_store(keep):
+    """
+    Apaga as bases mais antigas (por data de modificação) até o total caber em STORE_SIZE_LIMIT.
+    
+    Args:
+        keep: Caminho da base recém-gravada, que nunca é apagada
+    """
+    arquivos = []
+    for entry in os.scandir(store_path):
+        if not entry.name.endswith('.feather'):
+            continue
+        try:
+            info = entry.stat()
+        except FileNotFoundError:
+            # Apagado por outro processo durante a varredura
+            continue
+        arquivos.append((info.st_mtime, info.st_size, entry.path))
+    
+    total = 0
+    removidas = 0
+    for _, size, path in sorted(arquivos, reverse=True):
+        total += size
+        if total > STORE_SIZE_LIMIT and path != keep:
+            try:
+                os.remove(path)
+                removidas += 1
+            except FileNotFoundError:
+                pass
+    
+    if removidas:
+        # Nova geração: invalida os uploads memorizados pelo callback em segundo plano
+        marcador = os.path.join(store_path, STORE_GENERATION_FILE)
+        tmp_path = f"{marcador}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as arquivo:
+            arquivo.write(secrets.token_hex(8))
+        os.replace(tmp_path, marcador)
+
+def dataframe_to_store(df):
+    """
+    Grava o DataFrame em Feather (Arrow) no disco e devolve o payload do dcc.Store.
+    
+    O Store leva só a chave do conteúdo: como ele é Input de vários callbacks,
+    qualquer byte a mais nele viaja do navegador ao servidor em toda interação.
+    O arquivo em disco é compartilhado entre os workers do Gunicorn. Nada vai para
+    os caches em memória: o upload roda num processo à parte (callback em segundo
+    plano), e cada worker carrega a base na primeira leitura (load_dataframe).
+    """
+    df = df.reset_index(drop=True)
+    key = dataframe_fingerprint(df)
+    
+    path = store_file({'key': key})
+    if not os.path.exists(path):
+        # Grava em arquivo temporário e renomeia, para outro worker nunca ler um arquivo pela metade
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # LZ4 explícito: compressão barata sobre as colunas Arrow (códigos das categorias,
+        # float32, booleanos), com descompressão mais rápida que a leitura do disco
+        df.to_feather(tmp_path, compression='lz4')
+        os.replace(tmp_path, path)
+    else:
+        # Mesma base enviada de novo: conta como recente para a limpeza abaixo
+        os.utime(path)
+    prune_store(path)
+    return {'key': key}
+
+def load_dataframe(data):
+    """
+    Reconstrói o DataFrame do dcc.Store, usando o cache do servidor quando disponível.
+    
+    Returns:
+        O DataFrame, ou None se o arquivo da base não existir mais (ex.: novo deploy)
+    """
+    cache_key = f"df:{data['key']}"
+    df = frame_cache.get(cache_key)
+    if df is None:
+        # Cache é por processo: outro worker pode não ter o DataFrame ainda
+        path = store_file(data)
+        if not os.path.exists(path):
+            return None
+        # memory_map evita copiar o arquivo para um buffer antes de descomprimir cada coluna,
+        # e split_blocks mantém uma coluna por bloco, sem consolidar em matrizes 2D;
+        # dtypes (category, float32, bool) são preservados
+        df = feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+        frame_cache.set(cache_key, df)
+    return df
+
+def load_filtered_dataframe(data, filters):
+    """
+    Retorna o recorte da base para a seleção de filtros, calculado uma vez por seleção.
+    
+    KPIs e abas disparam juntos a cada mudança de filtro: o segundo callback reaproveita
+    o recorte do primeiro pela assinatura dos filtros, sem refiltrar a base.
+    
+    Returns:
+        O DataFrame filtrado, ou None se o arquivo da base não existir mais
+    """
+    if not has_active_filters(filters):
+        return load_dataframe(data)
+    
+    cache_key = f"filtered:{data['key']}:{filters_signature(filters)}"
+    df = frame_cache.get(cache_key)
+    if df is None:
+        df = load_dataframe(data)
+        if df is None:
+            return None
+        df = apply_filters(df, filters)
+        frame_cache.set(cache_key, df)
+    return df
+
+def prejson(component):
+    """
+    Converte a árvore de componentes (incluindo as figuras Plotly) em dicts/listas JSON puros.
+    
+    O conteúdo em cache é devolvido nas trocas de aba sem repetir a serialização
+    das figuras, que é a parte mais cara da resposta.
+    """
+    return json_loads(to_json_plotly(component))
+
+def table_records(df: pd.DataFrame, money_columns=()) -> list:
+    """
+    Linhas do DataFrame no formato `data` do DataTable (lista de dicts).
+    
+    Cada coluna vira uma lista de valores Python uma vez só (tolist), e os dicts são
+    montados por zip, sem a iteração célula a célula do to_dict('records').
+    
+    A formatação fica com o `format` das colunas (números continuam numéricos e
+    ordenáveis no navegador); as colunas em `money_columns` só são arredondadas aos
+    centavos exibidos, encurtando o JSON enviado.
+    """
+    columns = df.columns.tolist()
+    values = [
+        np.round(df[col].to_numpy(), 2).tolist() if col in money_columns else df[col].tolist()
+        for col in columns
+    ]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+# Funções auxiliares para agregações
+def voucher_measures(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Medidas por linha somadas nos agrupamentos: vouchers emitidos e utilizados
+    (0/1), os respectivos valores e as linhas utilizadas, com ou sem IMEI.
+    """
+    emitidos = df['is_issued'].to_numpy()
+    utilizados = df['is_used'].to_numpy()
+    # Valores ficam em float32 (metade do tráfego de memória): o np.bincount
+    # já acumula as somas em float64
+    valor = df['valor_dispositivo'].to_numpy()
+    return {
+        'vouchers': emitidos,
+        'valor': valor,
+        'utilizados': emitidos & utilizados,
+        'valor_utilizado': np.where(utilizados, valor, 0),
+        'linhas_utilizadas': utilizados
+    }
+
+def aggregate_vouchers(df: pd.DataFrame, by: str, measures: Dict[str, np.ndarray] = None) -> pd.DataFrame:
+    """
+    Agrega os vouchers por uma coluna.
+    
+    Usa os códigos inteiros da coluna (category ou factorize) e np.bincount,
+    fazendo cada soma em uma única passada sobre arrays numpy.
+    
+    Args:
+        df: DataFrame com os dados de vouchers
+        by: Coluna de agrupamento
+        measures: Medidas de voucher_measures(df), para reaproveitar entre agrupamentos
+    
+    Returns:
+        DataFrame indexado por `by` com quantidade e valor dos vouchers
+        emitidos ('vouchers', 'valor') e utilizados ('utilizados', 'valor_utilizado'),
+        além do total de linhas utilizadas ('linhas_utilizadas')
+    """
+    if measures is None:
+        measures = voucher_measures(df)
+    
+    column = df[by]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        labels = column.cat.categories
+    else:
+        codes, labels = pd.factorize(column, sort=True)
+    
+    # Como no groupby, linhas sem chave (código -1) ficam de fora: os códigos são
+    # deslocados em 1 e o compartimento 0 (sem chave) é descartado no fim, sem copiar
+    # as medidas só das linhas válidas. O bincount trabalha em intp de qualquer forma
+    bins = codes.astype(np.intp) + 1
+    
+    # Medidas booleanas são contagens: histograma inteiro dos códigos marcados, sem
+    # passar por pesos float; as de valor somam com weights e voltam aos centavos,
+    # sem o ruído dos valores em float32 nos gráficos (ex.: 12464.91000366211)
+    n = len(labels) + 1
+    linhas = np.bincount(bins, minlength=n)[1:]
+    result = pd.DataFrame({
+        name: (np.bincount(bins[values], minlength=n) if values.dtype == bool
+               else np.round(np.bincount(bins, weights=values, minlength=n), 2))[1:]
+        for name, values in measures.items()
+    }, index=pd.Index(labels, name=by))
+    
+    # Equivalente ao observed=True: só os grupos presentes no recorte
+    return result[linhas > 0]
+
+def aggregate_daily(df: pd.DataFrame, measures: Dict[str, np.ndarray] = None) -> pd.DataFrame:
+    """
+    Agrega os vouchers por dia, já com o índice convertido para datas.
+    
+    A conversão é feita uma vez, só sobre os dias presentes no agregado, para que
+    os gráficos temporais não precisem reconverter o texto a cada renderização.
+    Como DAY_FORMAT é ISO (AAAA-MM-DD), o numpy lê os dias direto como datetime64,
+    sem passar pelo parser de formatos do pd.to_datetime.
+    """
+    daily = aggregate_vouchers(df, 'data_str', measures)
+    dias = daily.index.to_numpy(dtype='datetime64[D]').astype('datetime64[ns]')
+    daily.index = pd.DatetimeIndex(dias, name='data')
+    return daily
+
+def compute_summary(df: pd.DataFrame) -> Dict[str, float]:
+    """
+    Calcula os totais exibidos nos cards de KPI (quantidades, valor, ticket e taxa).
+    
+    Reduções direto nos arrays numpy, sem montar o DataFrame dos utilizados.
+    """
+    utilizados = df['is_used'].to_numpy()
+    total_vouchers = len(df)
+    total_utilizados = int(np.count_nonzero(utilizados))
+    valor_total = round(float(df['valor_dispositivo'].to_numpy()[utilizados].sum(dtype=np.float64)), 2)
+    return {
+        'total_vouchers': total_vouchers,
+        'total_utilizados': total_utilizados,
+        'valor_total': valor_total,
+        'ticket_medio': valor_total / total_utilizados if total_utilizados > 0 else 0,
+        'taxa_utilizacao': (total_utilizados / total_vouchers * 100) if total_vouchers > 0 else 0
+    }
+
+class VoucherAggregates(dict):
+    """
+    Agrupamentos compartilhados pelas abas, calculados sob demanda: totais dos KPIs
+    ('summary') e vouchers por dia ('daily'), por rede ('networks') e por vendedor ('sellers').
+    
+    Cada aba lê só os agrupamentos que usa (os KPIs, por exemplo, só o 'summary'), e
+    cada um é calculado uma vez no primeiro acesso. As medidas por linha também são
+    extraídas uma vez e somadas por todas as chaves.
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        super().__init__()
+        self.df = df
+        self._measures = None
+    
+    @property
+    def measures(self) -> Dict[str, np.ndarray]:
+        if self._measures is None:
+            self._measures = voucher_measures(self.df)
+        return self._measures
+    
+    def __missing__(self, name):
+        if name == 'summary':
+            value = compute_summary(self.df)
+        elif name == 'daily':
+            value = aggregate_daily(self.df, self.measures)
+        elif name == 'networks':
+            value = aggregate_vouchers(self.df, 'nome_rede', self.measures)
+        elif name == 'sellers':
+            value = aggregate_vouchers(self.df, 'nome_vendedor', self.measures)
+        else:
+            raise KeyError(name)
+        self[name] = value
+        return value
+
+def compute_aggregates(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Agrupamentos compartilhados pelas abas para o recorte (ver VoucherAggregates)"""
+    return VoucherAggregates(df)
+
+def get_aggregates(data, filters, df):
+    """Retorna os agrupamentos do recorte atual, calculando-os só na primeira vez"""
+    cache_key = f"aggregates:{data['key']}:{filters_signature(filters)}"
+    aggregates = frame_cache.get(cache_key)
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+        frame_cache.set(cache_key, aggregates)
+    return aggregates
+
 # Funções auxiliares para mensagens
 def no_data_message():
     """Retorna mensagem quando não há dados disponíveis"""
@@ -910,6 +1552,31 @@ def error_message(error_text=None):
         className="mb-4"
     )
 
+# Layouts fixos dos gráficos, montados uma vez no carregamento do módulo
+# (séries diárias da visão geral, projeções e TIM; dispersão do engajamento)
+TIME_SERIES_LAYOUT = dict(
+    xaxis_title='Data',
+    yaxis_title='Quantidade de Vouchers',
+    height=400,
+    template='plotly_white',
+    showlegend=True
+)
+
+VALUE_AXIS_LAYOUT = dict(
+    title='Valor (R$)',
+    overlaying='y',
+    side='right'
+)
+
+ENGAGEMENT_SCATTER_LAYOUT = dict(
+    title='🎯 Engajamento por Vendedor',
+    xaxis_title='Quantidade de Vouchers',
+    yaxis_title='Valor Total (R$)',
+    height=500,
+    template='plotly_white',
+    showlegend=False
+)
+
 def generate_tim_content(df: pd.DataFrame) -> html.Div:
     """
     Gera o conteúdo da aba TIM.
@@ -924,18 +1591,22 @@ def generate_tim_content(df: pd.DataFrame) -> html.Div:
         if df.empty:
             return no_data_message()
         
-        # Filtrar apenas dados da TIM
-        df_tim = df[df['nome_rede'].str.contains('TIM', case=False, na=False)]
+        # Filtrar apenas dados da TIM: o texto é testado só nas categorias de rede,
+        # e as linhas saem da tabela de consulta pelos códigos. Categorias que não são
+        # texto (ex.: código numérico da rede) nunca contam como TIM
+        redes = df['nome_rede']
+        redes_tim = np.asarray(redes.cat.categories.astype(str).str.contains('TIM', case=False, regex=False))
+        df_tim = df[lookup_table(redes_tim)[redes.cat.codes.to_numpy()]]
         
         if df_tim.empty:
             return dbc.Alert("Nenhum dado da TIM disponível para análise.", color="warning")
         
-        # Métricas específicas da TIM
-        total_vouchers = len(df_tim)
-        vouchers_utilizados = df_tim[df_tim['situacao_voucher'].str.lower().str.contains('utilizado|usado|ativo', na=False)]
-        total_utilizados = len(vouchers_utilizados)
-        valor_total = vouchers_utilizados['valor_dispositivo'].sum()
-        taxa_utilizacao = (total_utilizados / total_vouchers * 100) if total_vouchers > 0 else 0
+        # Métricas específicas da TIM (mesmos totais dos KPIs gerais)
+        summary = compute_summary(df_tim)
+        total_vouchers = summary['total_vouchers']
+        total_utilizados = summary['total_utilizados']
+        valor_total = summary['valor_total']
+        taxa_utilizacao = summary['taxa_utilizacao']
         
         # Cards com métricas
         cards = dbc.Row([
@@ -963,31 +1634,21 @@ def generate_tim_content(df: pd.DataFrame) -> html.Div:
             ], md=6)
         ])
         
-        # Análise temporal
-        df_tim['data'] = pd.to_datetime(df_tim['data_str'])
-        daily_data = df_tim.groupby('data').agg({
-            'imei': 'count',
-            'valor_dispositivo': 'sum'
-        }).reset_index()
+        # Análise temporal: agrupa pela data em texto e só converte as datas únicas,
+        # sem escrever uma coluna nova no recorte (que exigiria copiar o DataFrame)
+        daily_data = aggregate_daily(df_tim)
         
         fig_evolution = go.Figure()
         fig_evolution.add_trace(go.Scatter(
-            x=daily_data['data'],
-            y=daily_data['imei'],
+            x=daily_data.index,
+            y=daily_data['vouchers'],
             mode='lines+markers',
             name='Vouchers',
             line=dict(color='#004691', width=2),  # Cor da TIM
             marker=dict(size=6)
         ))
         
-        fig_evolution.update_layout(
-            title='📈 Evolução Diária TIM',
-            xaxis_title='Data',
-            yaxis_title='Quantidade de Vouchers',
-                height=400,
-            template='plotly_white',
-            showlegend=True
-        )
+        fig_evolution.update_layout(title='📈 Evolução Diária TIM', **TIME_SERIES_LAYOUT)
         
         return html.Div([
             cards,
@@ -1001,70 +1662,47 @@ def generate_tim_content(df: pd.DataFrame) -> html.Div:
         traceback.print_exc()
         return error_message()
 
-def generate_kpi_cards(df: pd.DataFrame) -> html.Div:
+# Classes do valor de cada card de KPI, por cor
+KPI_VALUE_CLASSES = {
+    cor: f"text-{cor} text-center display-4"
+    for cor in ('primary', 'success', 'info', 'warning')
+}
+
+def generate_kpi_cards(summary: Dict[str, float]) -> html.Div:
     """
     Gera cards com KPIs principais.
     
     Args:
-        df: DataFrame com os dados de vouchers
+        summary: Totais de compute_summary, compartilhados pelo callback de KPIs e pela visão geral
     
     Returns:
         Um componente Div com os cards de KPIs
     """
     try:
-        # Calcular métricas
-        total_vouchers = len(df)
-        vouchers_utilizados = df[df['situacao_voucher'].str.lower().str.contains('utilizado|usado|ativo', na=False)]
-        total_utilizados = len(vouchers_utilizados)
-        valor_total = vouchers_utilizados['valor_dispositivo'].sum()
-        ticket_medio = valor_total / total_utilizados if total_utilizados > 0 else 0
-        taxa_utilizacao = (total_utilizados / total_vouchers * 100) if total_vouchers > 0 else 0
-
-        # Criar cards
+        total_vouchers = summary['total_vouchers']
+        total_utilizados = summary['total_utilizados']
+        valor_total = summary['valor_total']
+        ticket_medio = summary['ticket_medio']
+        taxa_utilizacao = summary['taxa_utilizacao']
+
+        # Criar cards: (título, valor, cor, legenda) montados por um único template
+        cards = (
+            ("📊 Total de Vouchers", f"{total_vouchers:,}", "primary", "Vouchers emitidos"),
+            ("✅ Vouchers Utilizados", f"{total_utilizados:,}", "success", f"Taxa de utilização: {taxa_utilizacao:.1f}%"),
+            ("💰 Valor Total", f"R$ {valor_total:,.2f}", "info", "Valor total dos vouchers utilizados"),
+            ("🎯 Ticket Médio", f"R$ {ticket_medio:,.2f}", "warning", "Valor médio por voucher utilizado")
+        )
         return dbc.Row([
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
-                        html.H4("📊 Total de Vouchers", className="card-title text-center"),
-                        html.H2(f"{total_vouchers:,}",
-                               className="text-primary text-center display-4"),
-                        html.P("Vouchers emitidos", className="text-muted text-center")
-                    ])
-                ], className="mb-4 shadow-sm")
-            ], md=3),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4("✅ Vouchers Utilizados", className="card-title text-center"),
-                        html.H2(f"{total_utilizados:,}",
-                               className="text-success text-center display-4"),
-                        html.P(f"Taxa de utilização: {taxa_utilizacao:.1f}%",
-                              className="text-muted text-center")
-                    ])
-                ], className="mb-4 shadow-sm")
-            ], md=3),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4("💰 Valor Total", className="card-title text-center"),
-                        html.H2(f"R$ {valor_total:,.2f}",
-                               className="text-info text-center display-4"),
-                        html.P("Valor total dos vouchers utilizados",
-                              className="text-muted text-center")
-                    ])
-                ], className="mb-4 shadow-sm")
-            ], md=3),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H4("🎯 Ticket Médio", className="card-title text-center"),
-                        html.H2(f"R$ {ticket_medio:,.2f}",
-                               className="text-warning text-center display-4"),
-                        html.P("Valor médio por voucher utilizado",
-                              className="text-muted text-center")
+                        html.H4(titulo, className="card-title text-center"),
+                        html.H2(valor, className=KPI_VALUE_CLASSES[cor]),
+                        html.P(legenda, className="text-muted text-center")
                     ])
                 ], className="mb-4 shadow-sm")
             ], md=3)
+            for titulo, valor, cor, legenda in cards
         ])
 
     except Exception as e:
@@ -1072,58 +1710,51 @@ def generate_kpi_cards(df: pd.DataFrame) -> html.Div:
         traceback.print_exc()
         return error_message()
 
-def generate_overview_content(df: pd.DataFrame) -> html.Div:
+def build_daily_evolution_figure(daily: pd.DataFrame) -> go.Figure:
+    """
+    Monta o gráfico de evolução diária (vouchers e valor) da visão geral.
+    
+    Args:
+        daily: Agregado diário de compute_aggregates, indexado por data
+    """
+    # Traços e layout num único construtor: cada add_trace/update_layout revalida a figura
+    datas = daily.index
+    return go.Figure(
+        data=[
+            go.Scatter(
+                x=datas,
+                y=daily['vouchers'].to_numpy(),
+                mode='lines+markers',
+                name='Vouchers',
+                line=dict(color='#3498db', width=2),
+                marker=dict(size=6)
+            ),
+            go.Scatter(
+                x=datas,
+                y=daily['valor'].to_numpy(),
+                mode='lines+markers',
+                name='Valor (R$)',
+                line=dict(color='#2ecc71', width=2),
+                marker=dict(size=6),
+                yaxis='y2'
+            )
+        ],
+        layout=dict(title='📈 Evolução Diária', yaxis2=VALUE_AXIS_LAYOUT, **TIME_SERIES_LAYOUT)
+    )
+
+def generate_overview_content(df: pd.DataFrame, aggregates: Dict[str, pd.DataFrame] = None) -> html.Div:
     """
     Gera o conteúdo da aba de visão geral.
     """
     try:
         if df.empty:
             return no_data_message()
+        if aggregates is None:
+            aggregates = compute_aggregates(df)
 
-        # Gerar KPIs
-        kpi_cards = generate_kpi_cards(df)
-
-        # Gráfico de evolução diária
-        daily_data = df.groupby('data_str').agg({
-                'imei': 'count',
-                'valor_dispositivo': 'sum'
-            }).reset_index()
-        daily_data.columns = ['data', 'vouchers', 'valor']
-        daily_data['data'] = pd.to_datetime(daily_data['data'])
-        daily_data = daily_data.sort_values('data')
-
-        fig_evolution = go.Figure()
-        fig_evolution.add_trace(go.Scatter(
-            x=daily_data['data'],
-            y=daily_data['vouchers'],
-            mode='lines+markers',
-                name='Vouchers',
-            line=dict(color='#3498db', width=2),
-            marker=dict(size=6)
-        ))
-        fig_evolution.add_trace(go.Scatter(
-            x=daily_data['data'],
-            y=daily_data['valor'],
-            mode='lines+markers',
-            name='Valor (R$)',
-            line=dict(color='#2ecc71', width=2),
-            marker=dict(size=6),
-            yaxis='y2'
-        ))
-
-        fig_evolution.update_layout(
-            title='📈 Evolução Diária',
-                xaxis_title='Data',
-            yaxis_title='Quantidade de Vouchers',
-            yaxis2=dict(
-                title='Valor (R$)',
-                overlaying='y',
-                side='right'
-            ),
-                height=400,
-            template='plotly_white',
-            showlegend=True
-        )
+        # KPIs e gráfico saem dos agregados já calculados para o recorte
+        kpi_cards = generate_kpi_cards(aggregates['summary'])
+        fig_evolution = build_daily_evolution_figure(aggregates['daily'])
 
         return html.Div([
             kpi_cards,
@@ -1137,29 +1768,36 @@ def generate_overview_content(df: pd.DataFrame) -> html.Div:
         traceback.print_exc()
         return error_message()
 
-def generate_networks_content(df: pd.DataFrame) -> html.Div:
+def generate_networks_content(df: pd.DataFrame, aggregates: Dict[str, pd.DataFrame] = None) -> html.Div:
     """
     Gera o conteúdo da aba de redes.
     """
     try:
         if df.empty:
             return no_data_message()
-
-        # Análise por rede
-        network_metrics = df.groupby('nome_rede').agg({
-            'imei': 'count',
-            'valor_dispositivo': 'sum'
-        }).reset_index()
-        network_metrics.columns = ['rede', 'total_vouchers', 'valor_total']
-        
-        # Calcular vouchers utilizados por rede
-        utilizados = df[df['situacao_voucher'].str.lower().str.contains('utilizado|usado|ativo', na=False)]
-        network_metrics['vouchers_utilizados'] = utilizados.groupby('nome_rede')['imei'].count().reindex(network_metrics['rede']).fillna(0)
-        
-        # Calcular métricas adicionais
-        network_metrics['taxa_utilizacao'] = (network_metrics['vouchers_utilizados'] / network_metrics['total_vouchers'] * 100).fillna(0)
-        network_metrics['ticket_medio'] = (network_metrics['valor_total'] / network_metrics['vouchers_utilizados']).fillna(0)
-        network_metrics = network_metrics.sort_values('valor_total', ascending=False)
+        if aggregates is None:
+            aggregates = compute_aggregates(df)
+
+        # Análise por rede (vouchers emitidos e utilizados vêm do mesmo agrupamento)
+        # A tabela é montada de uma vez, já com os nomes finais e as métricas derivadas
+        # (divisões protegidas resolvidas em numpy, sem replace/fillna sobre colunas).
+        # A tabela pagina todas as redes, então a ordem por valor é completa, mas é feita
+        # por argsort sobre o array de valores do agregado, antes de montar as colunas
+        networks = aggregates['networks']
+        networks = networks.take(np.argsort(-networks['valor'].to_numpy(), kind='stable'))
+        total_vouchers = networks['vouchers'].to_numpy()
+        vouchers_utilizados = networks['utilizados'].to_numpy()
+        valor_total = networks['valor'].to_numpy()
+        network_metrics = pd.DataFrame({
+            'rede': networks.index,
+            'total_vouchers': total_vouchers,
+            'vouchers_utilizados': vouchers_utilizados,
+            'valor_total': valor_total,
+            'taxa_utilizacao': np.divide(vouchers_utilizados, total_vouchers,
+                                         out=np.zeros(len(networks)), where=total_vouchers > 0) * 100,
+            'ticket_medio': np.divide(valor_total, vouchers_utilizados,
+                                      out=np.zeros(len(networks)), where=vouchers_utilizados > 0)
+        })
 
         # Tabela de métricas por rede
         table = dash_table.DataTable(
@@ -1172,7 +1810,7 @@ def generate_networks_content(df: pd.DataFrame) -> html.Div:
                 {'name': 'Valor Total (R$)', 'id': 'valor_total', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
                 {'name': 'Ticket Médio (R$)', 'id': 'ticket_medio', 'type': 'numeric', 'format': {'specifier': ',.2f'}}
             ],
-            data=network_metrics.to_dict('records'),
+            data=table_records(network_metrics, money_columns=['valor_total', 'ticket_medio']),
             style_table={'overflowX': 'auto'},
             style_cell={'textAlign': 'left', 'padding': '10px'},
             style_header={'backgroundColor': '#f8f9fa', 'fontWeight': 'bold'},
@@ -1195,25 +1833,35 @@ def generate_networks_content(df: pd.DataFrame) -> html.Div:
         traceback.print_exc()
         return error_message()
 
-def generate_rankings_content(df: pd.DataFrame) -> html.Div:
+def generate_rankings_content(df: pd.DataFrame, aggregates: Dict[str, pd.DataFrame] = None) -> html.Div:
     """
     Gera o conteúdo da aba de rankings.
     """
     try:
         if df.empty:
             return no_data_message()
+        if aggregates is None:
+            aggregates = compute_aggregates(df)
 
-        # Filtrar apenas vouchers utilizados
-        df_utilizados = df[df['situacao_voucher'].str.lower().str.contains('utilizado|usado|ativo', na=False)]
-
-        # Rankings por vendedor
-        vendedor_metrics = df_utilizados.groupby('nome_vendedor').agg({
-            'imei': 'count',
-            'valor_dispositivo': 'sum'
-        }).reset_index()
-        vendedor_metrics.columns = ['vendedor', 'total_vouchers', 'valor_total']
-        vendedor_metrics['ticket_medio'] = vendedor_metrics['valor_total'] / vendedor_metrics['total_vouchers']
-        vendedor_metrics = vendedor_metrics.sort_values('valor_total', ascending=False)
+        # Rankings por vendedor, considerando apenas vouchers utilizados
+        sellers = aggregates['sellers']
+        total_vouchers = sellers['utilizados'].to_numpy()
+        valor_total = sellers['valor_utilizado'].to_numpy()
+        
+        # Recorta o top 10 antes de montar a tabela: só ele é derivado e serializado.
+        # argpartition separa os 10 maiores sem ordenar todos os vendedores; só eles são ordenados.
+        # Entram todos os vendedores com linhas utilizadas, mesmo sem IMEI preenchido
+        top = np.flatnonzero(sellers['linhas_utilizadas'].to_numpy() > 0)
+        if len(top) > 10:
+            top = top[np.argpartition(-valor_total[top], 9)[:10]]
+        top = top[np.argsort(-valor_total[top], kind='stable')]
+        vendedor_metrics = pd.DataFrame({
+            'vendedor': sellers.index[top],
+            'total_vouchers': total_vouchers[top],
+            'valor_total': valor_total[top],
+            'ticket_medio': np.divide(valor_total[top], total_vouchers[top],
+                                      out=np.zeros(len(top)), where=total_vouchers[top] > 0)
+        })
 
         # Tabela Top Vendedores
         table_vendedores = dash_table.DataTable(
@@ -1224,7 +1872,7 @@ def generate_rankings_content(df: pd.DataFrame) -> html.Div:
                 {'name': 'Valor Total (R$)', 'id': 'valor_total', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
                 {'name': 'Ticket Médio (R$)', 'id': 'ticket_medio', 'type': 'numeric', 'format': {'specifier': ',.2f'}}
             ],
-            data=vendedor_metrics.head(10).to_dict('records'),
+            data=table_records(vendedor_metrics, money_columns=['valor_total', 'ticket_medio']),
             style_table={'overflowX': 'auto'},
             style_cell={'textAlign': 'left', 'padding': '10px'},
             style_header={'backgroundColor': '#f8f9fa', 'fontWeight': 'bold'}
@@ -1244,7 +1892,7 @@ def generate_rankings_content(df: pd.DataFrame) -> html.Div:
         traceback.print_exc()
         return error_message()
 
-def generate_projections_content(df: pd.DataFrame) -> html.Div:
+def generate_projections_content(df: pd.DataFrame, aggregates: Dict[str, pd.DataFrame] = None) -> html.Div:
     """
     Gera o conteúdo da aba de projeções.
     
@@ -1258,52 +1906,50 @@ def generate_projections_content(df: pd.DataFrame) -> html.Div:
         if df.empty:
             return no_data_message()
         
-        # Converter data para datetime
-        df['data'] = pd.to_datetime(df['data_str'])
+        if aggregates is None:
+            aggregates = compute_aggregates(df)
         
-        # Agrupar por data e calcular métricas diárias
-        daily_metrics = df.groupby('data').agg({
-            'imei': 'count',
-            'valor_dispositivo': 'sum'
-        }).reset_index()
+        # Métricas diárias lidas direto do agregado compartilhado com a visão geral
+        # (somente leitura: nenhuma cópia em DataFrame próprio)
+        daily = aggregates['daily']
+        if daily.empty:
+            # Nenhuma linha com data válida no recorte: não há série para projetar
+            return no_data_message()
         
-        # Calcular médias móveis para suavizar tendências
-        daily_metrics['media_movel_vouchers'] = daily_metrics['imei'].rolling(window=7).mean()
-        daily_metrics['media_movel_valor'] = daily_metrics['valor_dispositivo'].rolling(window=7).mean()
+        # Uma única soma acumulada de vouchers e valor alimenta a média móvel de 7 dias
+        # (só a de vouchers vai para o gráfico) e as médias diárias das projeções
+        medidas = daily[['vouchers', 'valor']].to_numpy(dtype=np.float64)
+        acumulado = np.cumsum(medidas, axis=0)
+        total_dias = len(medidas)
+        media_movel_vouchers = np.full(total_dias, np.nan)
+        if total_dias >= 7:
+            media_movel_vouchers[6:] = (acumulado[6:, 0] - np.concatenate(([0.0], acumulado[:-7, 0]))) / 7
         
         # Criar gráfico de tendências
         fig_trends = go.Figure()
         
         # Vouchers diários e média móvel
         fig_trends.add_trace(go.Scatter(
-            x=daily_metrics['data'],
-            y=daily_metrics['imei'],
+            x=daily.index,
+            y=daily['vouchers'],
             mode='lines',
             name='Vouchers Diários',
             line=dict(color='#3498db', width=1)
         ))
         
         fig_trends.add_trace(go.Scatter(
-            x=daily_metrics['data'],
-            y=daily_metrics['media_movel_vouchers'],
+            x=daily.index,
+            y=media_movel_vouchers,
             mode='lines',
             name='Média Móvel (7 dias)',
             line=dict(color='#e74c3c', width=2)
         ))
         
-        fig_trends.update_layout(
-            title='📈 Tendência de Vouchers',
-            xaxis_title='Data',
-            yaxis_title='Quantidade de Vouchers',
-            height=400,
-            template='plotly_white',
-            showlegend=True
-        )
+        fig_trends.update_layout(title='📈 Tendência de Vouchers', **TIME_SERIES_LAYOUT)
         
-        # Calcular projeções simples
-        total_dias = (daily_metrics['data'].max() - daily_metrics['data'].min()).days
-        media_diaria_vouchers = daily_metrics['imei'].mean()
-        media_diaria_valor = daily_metrics['valor_dispositivo'].mean()
+        # Calcular projeções simples: médias diárias pela última linha do acumulado
+        # (sem nova passada sobre os dias nem acessos escalares do pandas)
+        media_diaria_vouchers, media_diaria_valor = (acumulado[-1] / total_dias).tolist()
         
         projecao_mensal_vouchers = media_diaria_vouchers * 30
         projecao_mensal_valor = media_diaria_valor * 30
@@ -1346,7 +1992,7 @@ def generate_projections_content(df: pd.DataFrame) -> html.Div:
         traceback.print_exc()
         return error_message()
 
-def generate_engagement_content(df: pd.DataFrame) -> html.Div:
+def generate_engagement_content(df: pd.DataFrame, aggregates: Dict[str, pd.DataFrame] = None) -> html.Div:
     """
     Gera o conteúdo da aba de engajamento.
     
@@ -1360,42 +2006,33 @@ def generate_engagement_content(df: pd.DataFrame) -> html.Div:
         if df.empty:
             return no_data_message()
         
-        # Análise de engajamento por vendedor
-        vendedor_engagement = df.groupby('nome_vendedor').agg({
-            'imei': 'count',
-            'valor_dispositivo': 'sum'
-        }).reset_index()
+        if aggregates is None:
+            aggregates = compute_aggregates(df)
         
-        # Calcular métricas de engajamento
-        vendedor_engagement['ticket_medio'] = vendedor_engagement['valor_dispositivo'] / vendedor_engagement['imei']
-        vendedor_engagement = vendedor_engagement.sort_values('imei', ascending=False)
-        
-        # Gráfico de dispersão Vouchers x Valor
-        fig_scatter = px.scatter(
-            vendedor_engagement,
-            x='imei',
-            y='valor_dispositivo',
-            text='nome_vendedor',
-            title='🎯 Engajamento por Vendedor',
-            labels={
-                'imei': 'Quantidade de Vouchers',
-                'valor_dispositivo': 'Valor Total (R$)',
-                'nome_vendedor': 'Vendedor'
-            }
-        )
+        # Análise de engajamento por vendedor
+        vendedor_engagement = aggregates['sellers'][['vouchers', 'valor']].reset_index()
+        vendedor_engagement.columns = ['nome_vendedor', 'imei', 'valor_dispositivo']
         
-        fig_scatter.update_traces(
+        # Gráfico de dispersão Vouchers x Valor, direto dos arrays do agregado
+        # (sem o DataFrame intermediário e a inferência de colunas do plotly.express)
+        fig_scatter = go.Figure(go.Scatter(
+            x=vendedor_engagement['imei'].to_numpy(),
+            y=vendedor_engagement['valor_dispositivo'].to_numpy(),
+            text=vendedor_engagement['nome_vendedor'].to_numpy(),
+            mode='markers+text',
             textposition='top center',
-            marker=dict(size=10)
-        )
+            marker=dict(size=10),
+            hovertemplate='Vendedor=%{text}<br>Quantidade de Vouchers=%{x}<br>Valor Total (R$)=%{y}<extra></extra>'
+        ))
         
-        fig_scatter.update_layout(
-            height=500,
-            template='plotly_white',
-            showlegend=False
-        )
+        fig_scatter.update_layout(**ENGAGEMENT_SCATTER_LAYOUT)
+        
+        # Tabela de engajamento: nlargest seleciona os 10 vendedores com mais vouchers
+        # sem ordenar todos (o gráfico de dispersão não depende da ordem), e o ticket
+        # médio só é calculado para eles
+        top_engagement = vendedor_engagement.nlargest(10, 'imei')
+        top_engagement['ticket_medio'] = top_engagement['valor_dispositivo'] / top_engagement['imei']
         
-        # Tabela de engajamento
         table_engagement = dash_table.DataTable(
             id='engagement-table',
             columns=[
@@ -1404,7 +2041,7 @@ def generate_engagement_content(df: pd.DataFrame) -> html.Div:
                 {'name': 'Valor Total (R$)', 'id': 'valor_dispositivo', 'type': 'numeric', 'format': {'specifier': ',.2f'}},
                 {'name': 'Ticket Médio (R$)', 'id': 'ticket_medio', 'type': 'numeric', 'format': {'specifier': ',.2f'}}
             ],
-            data=vendedor_engagement.head(10).to_dict('records'),
+            data=table_records(top_engagement, money_columns=['valor_dispositivo', 'ticket_medio']),
             style_table={'overflowX': 'auto'},
             style_cell={'textAlign': 'left', 'padding': '10px'},
             style_header={'backgroundColor': '#f8f9fa', 'fontWeight': 'bold'},
@@ -1469,4 +2106,9 @@ def test_page():
     '''
 
 if __name__ == '__main__':
-    app.run_server(debug=True, host='0.0.0.0', port=8080)
+    # Apenas para desenvolvimento local; em produção use o Gunicorn (gunicorn.conf.py)
+    app.run_server(
+        debug=server.config['DEBUG'],
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', 8080))
+    )
@@ -2,8 +2,18 @@ import multiprocessing
 import os
 
 # Configurações básicas
-bind = "0.0.0.0:8080"
-workers = 3  # Valor fixo mais conservador
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+# Workers: WEB_CONCURRENCY quando definido; senão 2 * CPUs + 1, contando só as CPUs
+# disponíveis para o processo (cpu_count vê todas as do host, não as do container)
+# e limitado a 4, já que cada worker mantém seus próprios caches em memória
+def default_workers(max_workers=4):
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+    return min(cpus * 2 + 1, max_workers)
+
+workers = int(os.environ.get('WEB_CONCURRENCY', default_workers()))
 threads = 2
 worker_class = "gthread"
 worker_connections = 1000
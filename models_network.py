@@ -6,7 +6,22 @@ import sqlite3
 import pandas as pd
 from datetime import datetime
 import os
-from unidecode import unidecode
+
+# Acentos do português resolvidos por tabela (str.translate), sem passar pelo unidecode
+ACCENTS_TABLE = str.maketrans(
+    'áàâãäéèêëíìîïóòôõöúùûüçÁÀÂÃÄÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇ',
+    'aaaaaeeeeiiiiooooouuuucAAAAAEEEEIIIIOOOOOUUUUC'
+)
+
+def normalize_column_name(col):
+    """Normaliza o cabeçalho da planilha: sem acentos, minúsculo e com '_' no lugar de espaços"""
+    col = str(col).translate(ACCENTS_TABLE)
+    if not col.isascii():
+        # Caracteres fora da tabela (raros em cabeçalhos) continuam pelo unidecode,
+        # importado só quando um cabeçalho precisa dele
+        from unidecode import unidecode
+        col = unidecode(col)
+    return col.strip().lower().replace(' ', '_')
 
 class NetworkDatabase:
     """Classe simples para gerenciar redes"""
@@ -156,9 +171,9 @@ class NetworkDatabase:
         df['nome_filial'] = df['nome_filial'].apply(self.clean_text)
         
         # Tratar nome_rede: se estiver vazio, usar o nome_filial como nome da rede
-        df['nome_rede'] = df.apply(lambda row: 
-            self.clean_text(row['nome_filial']) if pd.isna(row['nome_rede']) or str(row['nome_rede']).strip() == '' 
-            else self.clean_text(row['nome_rede']), axis=1)
+        # (máscara vetorizada em vez de df.apply(axis=1), que monta uma Series por linha)
+        rede_vazia = df['nome_rede'].isna() | (df['nome_rede'].astype(str).str.strip() == '')
+        df['nome_rede'] = df['nome_rede'].mask(rede_vazia, df['nome_filial']).apply(self.clean_text)
         
         df['ativo'] = df['ativo'].apply(lambda x: 'ATIVO' if str(x).upper().strip() in ['SIM', 'S', 'TRUE', '1', 'ATIVO'] else 'INATIVO')
         df['data_inicio'] = df['data_inicio'].apply(self.format_date)
@@ -191,14 +206,15 @@ class NetworkDatabase:
             'data_cadastro': ['data_cadastro', 'data_registro', 'cadastro', 'base_cadastro', 'base_de_cadastro', 'data_base']
         }
         
-        # Verificar e mapear colunas
+        # Verificar e mapear colunas (cada cabeçalho é normalizado uma única vez,
+        # e não de novo para cada coluna procurada)
         final_mapping = {}
         missing_columns = []
+        normalized_columns = [(col, normalize_column_name(col)) for col in df.columns]
         
         for target_col, possible_names in column_mapping.items():
             found = False
-            for col in df.columns:
-                col_normalized = unidecode(str(col)).strip().lower().replace(' ', '_')
+            for col, col_normalized in normalized_columns:
                 if col_normalized in possible_names:
                     final_mapping[col] = target_col
                     found = True
@@ -257,38 +273,31 @@ class NetworkDatabase:
             print("Limpando tabela para nova importação...")
             conn.execute('DELETE FROM networks_branches')
             
-            # Processar redes e filiais
-            registros_inseridos = 0
-            for _, row in df.iterrows():
-                try:
-                    # Verificar se todos os campos obrigatórios estão preenchidos
-                    if pd.isna(row['nome_filial']) or row['nome_filial'].strip() == '':
-                        print(f"Pulando registro com nome da filial vazio: {row.to_dict()}")
-                        continue
-                    
-                    # Inserir registro
-                    conn.execute('''
-                    INSERT INTO networks_branches (
-                        nome_rede, nome_filial, ativo, data_inicio, created_at, updated_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        row['nome_rede'],
-                        row['nome_filial'],
-                        row['ativo'],
-                        row['data_inicio'],
-                        current_date,
-                        current_date
-                    ))
-                    registros_inseridos += 1
-                    
-                    if registros_inseridos % 100 == 0:
-                        print(f"Processados {registros_inseridos} registros...")
-                        
-                except Exception as e:
-                    print(f"Erro ao inserir registro: {row.to_dict()}")
-                    print(f"Erro: {str(e)}")
-                    continue
+            # Processar redes e filiais: os registros são montados de uma vez (itertuples)
+            # e gravados num único executemany, em vez de um INSERT por linha
+            colunas = ['nome_rede', 'nome_filial', 'ativo', 'data_inicio']
+            filial_vazia = df['nome_filial'].isna() | (df['nome_filial'].astype(str).str.strip() == '')
+            if filial_vazia.any():
+                print(f"Pulando {int(filial_vazia.sum())} registros com nome da filial vazio")
+            registros = [
+                (*registro, current_date, current_date)
+                for registro in df.loc[~filial_vazia, colunas].itertuples(index=False, name=None)
+            ]
+            
+            # Duplicatas de (rede, filial) são ignoradas pelo UNIQUE da tabela, como antes
+            # (quando o INSERT da linha falhava e ela era pulada)
+            alteracoes_antes = conn.total_changes
+            conn.executemany('''
+            INSERT OR IGNORE INTO networks_branches (
+                nome_rede, nome_filial, ativo, data_inicio, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', registros)
+            registros_inseridos = conn.total_changes - alteracoes_antes
+            
+            duplicados = len(registros) - registros_inseridos
+            if duplicados:
+                print(f"Registros duplicados (rede e filial) ignorados: {duplicados}")
 
             conn.commit()
             print(f"\nTotal de registros inseridos: {registros_inseridos}")
@@ -321,35 +330,26 @@ class NetworkDatabase:
         try:
             print("\n=== Consultando estatísticas do banco de dados ===")
             
-            # Total de redes ativas (contagem distinta de nome_rede)
-            total_networks = conn.execute('''
-                SELECT COUNT(DISTINCT nome_rede) 
-                FROM networks_branches 
-                WHERE UPPER(TRIM(ativo)) = 'ATIVO'
-            ''').fetchone()[0]
-            
-            print(f"Total de redes ativas: {total_networks}")
-            
-            # Debug: mostrar redes encontradas
+            # Filiais ativas por rede: uma única consulta agrupada fornece a lista de redes,
+            # o total de redes (um grupo por rede) e o total de filiais (soma dos grupos)
             redes = conn.execute('''
-                SELECT DISTINCT nome_rede, COUNT(*) as total_filiais
+                SELECT nome_rede, COUNT(*) as total_filiais
                 FROM networks_branches
                 WHERE UPPER(TRIM(ativo)) = 'ATIVO'
                 GROUP BY nome_rede
                 ORDER BY nome_rede
             ''').fetchall()
             
+            total_networks = len(redes)
+            total_branches = sum(total_filiais for _, total_filiais in redes)
+            
+            print(f"Total de redes ativas: {total_networks}")
+            
+            # Debug: mostrar redes encontradas
             print("\nRedes ativas encontradas:")
             for rede in redes:
                 print(f"- {rede[0]}: {rede[1]} filiais")
             
-            # Total de filiais ativas
-            total_branches = conn.execute('''
-                SELECT COUNT(*) 
-                FROM networks_branches 
-                WHERE UPPER(TRIM(ativo)) = 'ATIVO'
-            ''').fetchone()[0]
-            
             print(f"Total de filiais ativas: {total_branches}")
             
             # Total de colaboradores ativos
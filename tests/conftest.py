@@ -0,0 +1,71 @@
+"""
+Configuração comum dos testes do dashboard.
+"""
+
+import base64
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as dashboard  # noqa: E402
+
+
+def run_callback(callback, *args):
+    """Executa a função original do callback, sem o wrapper do Dash"""
+    return getattr(callback, '__wrapped__', callback)(*args)
+
+
+def excel_contents(df):
+    """Conteúdo de um dcc.Upload (data URL em base64) com o DataFrame gravado em Excel"""
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return 'data:application/vnd.ms-excel;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+
+def voucher_sheet(**columns):
+    """Planilha de vouchers mínima; `columns` substitui as colunas padrão"""
+    sheet = {
+        'Data': ['2024-01-01', '2024-01-02', '2024-01-03'],
+        'IMEI': ['111', '222', '333'],
+        'Valor do Voucher': [10.0, 20.0, 30.0],
+        'Valor do Dispositivo': [100.0, 200.0, 300.0],
+        'Status do Voucher': ['UTILIZADO', 'UTILIZADO', 'Expirado'],
+        'Vendedor': ['Ana', 'Bruno', 'Carla'],
+        'Filial': ['Centro', 'Norte', 'Sul'],
+        'Rede': ['TIM Rede', 'Rede B', 'Rede C'],
+    }
+    sheet.update(columns)
+    return pd.DataFrame(sheet)
+
+
+def store_frame(redes, vendedores=None, usados=None, emitidos=None, valores=None):
+    """DataFrame com as colunas e dtypes gravados pelo upload"""
+    n = len(redes)
+    return pd.DataFrame({
+        'data_str': pd.Categorical(['2024-01-01'] * n),
+        'valor_dispositivo': np.asarray(valores if valores is not None else [100.0] * n, dtype='float32'),
+        'situacao_voucher': pd.Categorical(['UTILIZADO'] * n),
+        'nome_vendedor': pd.Categorical(vendedores if vendedores is not None else ['Ana'] * n),
+        'nome_rede': pd.Categorical(redes),
+        'is_used': np.asarray(usados if usados is not None else [True] * n),
+        'is_issued': np.asarray(emitidos if emitidos is not None else [True] * n),
+    })
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    """Bases gravadas num diretório temporário e caches vazios a cada teste"""
+    monkeypatch.setattr(dashboard, 'store_path', str(tmp_path))
+    dashboard.cache.clear()
+    dashboard.frame_cache.clear()
+    dashboard.render_cache.clear()
+    yield
+    dashboard.cache.clear()
+    dashboard.frame_cache.clear()
+    dashboard.render_cache.clear()
@@ -0,0 +1,50 @@
+"""
+Testes do cache em memória dos DataFrames.
+"""
+
+import numpy as np
+import pandas as pd
+
+from conftest import dashboard, store_frame
+
+
+def frame_cache(maxbytes, maxsize=32):
+    return dashboard.MemoryCache(maxsize=maxsize, maxbytes=maxbytes, sizeof=dashboard.frame_footprint)
+
+
+def sized_frame(nbytes):
+    """DataFrame de uma coluna float64 com `nbytes` de dados (mais o índice)"""
+    return pd.DataFrame({'valor': np.zeros(nbytes // 8)}, index=pd.RangeIndex(nbytes // 8))
+
+
+def test_evicts_least_recently_used_frames_over_byte_limit():
+    cache = frame_cache(maxbytes=2500)
+    cache.set('a', sized_frame(1000))
+    cache.set('b', sized_frame(1000))
+    cache.get('a')
+
+    cache.set('c', sized_frame(1000))
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+
+
+def test_frame_shared_with_aggregates_counts_once():
+    df = store_frame(redes=['TIM'] * 200)
+    nbytes = dashboard.frame_footprint(df)[0][1]
+    cache = frame_cache(maxbytes=nbytes + 10)
+
+    cache.set('df', df)
+    cache.set('aggregates', dashboard.compute_aggregates(df))
+
+    assert cache.get('df') is df
+
+
+def test_keeps_newest_frame_even_above_limit():
+    cache = frame_cache(maxbytes=100)
+    cache.set('a', sized_frame(1000))
+    cache.set('b', sized_frame(1000))
+
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
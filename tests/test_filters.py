@@ -0,0 +1,21 @@
+"""
+Testes da seleção de filtros.
+"""
+
+from conftest import dashboard, run_callback, store_frame
+
+
+def test_filters_signature_accepts_mixed_selection():
+    first = {'networks': [123, 'TIM'], 'statuses': ['UTILIZADO', 7]}
+    second = {'networks': ['TIM', 123, 'TIM'], 'statuses': [7, 'UTILIZADO']}
+
+    assert dashboard.filters_signature(first) == dashboard.filters_signature(second)
+    assert dashboard.filters_signature(first) != dashboard.filters_signature({'networks': ['123', 'TIM']})
+
+
+def test_kpis_render_with_mixed_selection():
+    store = dashboard.dataframe_to_store(store_frame(redes=['123', 'TIM', 'Rede B']))
+
+    kpis = run_callback(dashboard.update_kpis, store, {'networks': [123, 'TIM'], 'statuses': []})
+
+    assert getattr(kpis, 'color', None) != 'danger'
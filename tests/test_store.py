@@ -0,0 +1,47 @@
+"""
+Testes das bases gravadas em disco (data/store).
+"""
+
+import os
+
+from conftest import dashboard
+
+
+def write_bases(directory, count, size=100):
+    """Grava `count` bases falsas, da mais antiga para a mais nova"""
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"{index}.feather")
+        with open(path, 'wb') as arquivo:
+            arquivo.write(b'x' * size)
+        os.utime(path, (index, index))
+        paths.append(path)
+    return paths
+
+
+def upload_cache_key():
+    """Chave com que o DiskcacheManager memoriza o upload de uma mesma planilha"""
+    manager = dashboard.background_callback_manager
+    return manager.build_cache_key(dashboard.process_upload, ['conteudo', 'vouchers.xlsx'], [])
+
+
+def test_prune_removes_oldest_and_invalidates_memoized_uploads(monkeypatch):
+    paths = write_bases(dashboard.store_path, 4)
+    monkeypatch.setattr(dashboard, 'STORE_SIZE_LIMIT', 250)
+    key_before = upload_cache_key()
+
+    dashboard.prune_store(keep=paths[-1])
+
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+    assert upload_cache_key() != key_before
+
+
+def test_prune_without_removal_keeps_memoized_uploads(monkeypatch):
+    paths = write_bases(dashboard.store_path, 2)
+    monkeypatch.setattr(dashboard, 'STORE_SIZE_LIMIT', 250)
+    key_before = upload_cache_key()
+
+    dashboard.prune_store(keep=paths[-1])
+
+    assert all(os.path.exists(path) for path in paths)
+    assert upload_cache_key() == key_before
@@ -0,0 +1,64 @@
+"""
+Testes do conteúdo das abas, a partir de bases já no formato do store.
+"""
+
+from conftest import dashboard, store_frame
+
+
+def component_texts(component):
+    """Textos de todos os componentes da árvore, em ordem"""
+    if isinstance(component, (list, tuple)):
+        return [text for child in component for text in component_texts(child)]
+    if isinstance(component, str):
+        return [component]
+    children = getattr(component, 'children', None)
+    return component_texts(children) if children is not None else []
+
+
+def test_tim_ignores_numeric_network_names():
+    df = store_frame(redes=[123, 456, 'TIM Sul'])
+
+    texts = component_texts(dashboard.generate_tim_content(df))
+
+    total = texts[texts.index("📱 Total de Vouchers TIM") + 1]
+    assert total == '1'
+
+
+def test_value_sums_are_rounded_to_cents():
+    df = store_frame(redes=['TIM', 'Rede B'], valores=[12464.91, 0.1])
+
+    aggregates = dashboard.compute_aggregates(df)
+    figure = dashboard.build_daily_evolution_figure(aggregates['daily'])
+
+    assert list(figure.data[1].y) == [12465.01]
+    assert list(aggregates['networks']['valor']) == [0.1, 12464.91]
+    assert aggregates['summary']['valor_total'] == 12465.01
+
+
+def find_component(component, component_id):
+    """Componente da árvore com o id informado, ou None"""
+    if isinstance(component, (list, tuple)):
+        for child in component:
+            found = find_component(child, component_id)
+            if found is not None:
+                return found
+        return None
+    if getattr(component, 'id', None) == component_id:
+        return component
+    children = getattr(component, 'children', None)
+    return find_component(children, component_id) if children is not None else None
+
+
+def test_rankings_include_sellers_without_imei():
+    df = store_frame(
+        redes=['TIM', 'TIM', 'TIM'],
+        vendedores=['Ana', 'Bruno', 'Carla'],
+        usados=[True, True, False],
+        emitidos=[False, True, True],
+        valores=[300.0, 200.0, 100.0]
+    )
+
+    table = find_component(dashboard.generate_rankings_content(df), 'vendedor-metrics-table')
+
+    assert [row['vendedor'] for row in table.data] == ['Ana', 'Bruno']
+    assert [row['total_vouchers'] for row in table.data] == [0, 1]
@@ -0,0 +1,32 @@
+"""
+Testes do upload da planilha de vouchers.
+"""
+
+from conftest import dashboard, excel_contents, run_callback, voucher_sheet
+
+
+def test_upload_accepts_columns_mixing_numbers_and_text():
+    sheet = voucher_sheet(
+        Rede=[123, 'TIM', None],
+        Vendedor=['Ana', 45, 'Carla'],
+        **{'Status do Voucher': ['UTILIZADO', 7, 'Expirado']}
+    )
+
+    store, status = run_callback(dashboard.process_upload, excel_contents(sheet), 'vouchers.xlsx')
+
+    assert store is not None, status
+    assert status.color == 'success'
+    df = dashboard.load_dataframe(store)
+    assert list(df['nome_rede'].cat.categories) == ['123', 'TIM']
+    assert df['nome_rede'].isna().sum() == 1
+    assert list(df['nome_vendedor'].cat.categories) == ['45', 'Ana', 'Carla']
+
+
+def test_filter_options_after_mixed_upload():
+    sheet = voucher_sheet(Rede=['TIM', 123, 'Rede B'])
+    store, status = run_callback(dashboard.process_upload, excel_contents(sheet), 'vouchers.xlsx')
+    assert store is not None, status
+
+    _, network_options, _ = run_callback(dashboard.update_filter_options, store)
+
+    assert [option['value'] for option in network_options] == ['123', 'Rede B', 'TIM']